@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path so `src` imports work when run as a script
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.config import BATCH_LLM_CONCURRENCY, TOP_K  # noqa: E402
+from src.rag.batch_answer import answer_batch, load_questions, write_results  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions in one batch (chat history untouched).")
+    parser.add_argument("input", type=Path, help='JSONL with {"question", "id"?, "expected_chunk_ids"?} per line.')
+    parser.add_argument("output", type=Path, help="JSONL with answers, sources and per-stage timings.")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--concurrency", type=int, default=BATCH_LLM_CONCURRENCY, help="Max concurrent LLM calls.")
+    parser.add_argument("--retrieval-only", action="store_true", help="Skip LLM calls; only retrieve and score recall.")
+    args = parser.parse_args(argv)
+
+    items = load_questions(args.input)
+    records, summary = answer_batch(items, args.top_k, args.concurrency, with_llm=not args.retrieval_only)
+    write_results(args.output, records)
+
+    print(
+        f"{summary['questions']} questions → {args.output} | "
+        f"index load {summary.get('index_load_ms', 0):.0f} ms, embed {summary.get('embed_ms', 0):.0f} ms, "
+        f"search {summary.get('search_ms', 0):.0f} ms, "
+        f"llm {summary.get('llm_ms', 0):.0f} ms ({summary.get('llm_errors', 0)} errors)"
+    )
+    if summary.get("mean_recall_at_k") is not None:
+        print(f"Recall@{summary['top_k']}: {summary['mean_recall_at_k']:.3f} over {summary['scored']} scored questions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+# Ensure project root is on sys.path so `src` imports work when run as a script
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.rag.retriever import ShardRoute, build_routes, search_shards  # noqa: E402
+from src.rag.vector_store import Shard  # noqa: E402
+
+
+def make_shards(vectors: np.ndarray, num_shards: int) -> list[Shard]:
+    shards: list[Shard] = []
+    for shard_id, part in enumerate(np.array_split(vectors, num_shards)):
+        index = faiss.IndexFlatL2(vectors.shape[1])
+        index.add(part)
+        metadata = [{"chunk_id": f"{shard_id}-{i}", "article_title": f"shard-{shard_id}"} for i in range(len(part))]
+        shards.append(Shard(f"shard-{shard_id}", index, metadata))
+    return shards
+
+
+def time_queries(routes: list[ShardRoute], queries: np.ndarray, top_k: int, workers: int) -> list[float]:
+    timings: list[float] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        search_shards(routes, queries[:1], top_k, executor=pool)  # warm-up
+        for row in range(len(queries)):
+            start = time.perf_counter()
+            search_shards(routes, queries[row : row + 1], top_k, executor=pool)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure sharded fan-out search latency on synthetic vectors.")
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=1024, help="1024 matches multilingual-e5-large.")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args(argv)
+
+    # One OpenMP thread per search, so any speed-up comes from the shard fan-out itself.
+    faiss.omp_set_num_threads(1)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.vectors, args.dim), dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    faiss.normalize_L2(queries)
+
+    print(f"{args.vectors} vectors, dim {args.dim}, {args.queries} queries, top_k {args.top_k}, {os.cpu_count()} cores")
+    print(f"{'shards':>6} {'workers':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for num_shards in args.shards:
+        routes = build_routes(make_shards(vectors, num_shards))
+        for workers in args.workers:
+            timings = sorted(time_queries(routes, queries, args.top_k, workers))
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{num_shards:>6} {workers:>7} {statistics.median(timings):>8.2f} {p95:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ from src.scraping.fetch_articles import fetch_all  # type: ignore  # noqa: E402
 def main() -> None:
     fetch_all()
     build_corpus()
-    build_index()
+    build_index([])
 
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -14,6 +15,16 @@ CHUNKS_JSON = PROCESSED_DIR / "chunks.json"
 INDEX_PATH = INDEX_DIR / "index.faiss"
 INDEX_METADATA = INDEX_DIR / "metadata.json"
 
+# Index snapshots
+SNAPSHOTS_DIR = INDEX_DIR / "snapshots"
+CURRENT_POINTER = INDEX_DIR / "CURRENT"
+SNAPSHOT_SHARDS_DIR = "shards"
+SNAPSHOT_INDEX_FILE = "index.faiss"
+SNAPSHOT_METADATA_FILE = "metadata.json"
+SNAPSHOT_MANIFEST_FILE = "manifest.json"
+SNAPSHOT_KEEP = 3
+SNAPSHOT_POLL_SECONDS = 5.0
+
 # Chunking
 CHUNK_SIZE = 500
 CHUNK_OVERLAP = 100
@@ -23,11 +34,16 @@ MIN_PARAGRAPH_LEN = 50
 # Retrieval
 TOP_K = 5
 
+# Sharding: "article" (one shard per article) or "period" (one shard per publication month)
+SHARD_BY = "article"
+SEARCH_WORKERS = min(8, os.cpu_count() or 1)
+
 # Embeddings
 EMBEDDING_MODEL_NAME = "intfloat/multilingual-e5-large"
 
 # OpenAI
 OPENAI_MODEL = "gpt-4o-mini"
+BATCH_LLM_CONCURRENCY = 8
 
 # UI
 DEFAULT_HISTORY_K = 10
@@ -20,6 +20,7 @@ from src.config import (  # noqa: E402
     PROCESSED_DIR,
     RAW_DIR,
 )
+from src.scraping.fetch_articles import extract_published_at  # noqa: E402
 
 
 def load_raw_documents(raw_dir: Path | None = None) -> list[dict]:
@@ -27,11 +28,17 @@ def load_raw_documents(raw_dir: Path | None = None) -> list[dict]:
     docs: list[dict] = []
     for path in raw_dir.glob("*.txt"):
         data = json.loads(path.read_text(encoding="utf-8"))
+        published_at = data.get("published_at")
+        html_path = path.with_suffix(".html")
+        if published_at is None and html_path.exists():
+            # Raw files scraped before the date was recorded: recover it from the HTML.
+            published_at = extract_published_at(html_path.read_text(encoding="utf-8"))
         docs.append(
             {
                 "slug": path.stem,
                 "title": data.get("title", ""),
                 "url": data.get("url"),
+                "published_at": published_at,
                 "paragraphs": data.get("paragraphs", []),
             }
         )
@@ -66,6 +73,7 @@ def build_chunks(docs: Iterable[dict]) -> list[dict]:
     for doc in docs:
         title = doc.get("title", "")
         url_guess = doc.get("url")
+        published_at = doc.get("published_at")
         paragraphs = doc.get("paragraphs", [])
         model_name = detect_model_name(title)
         buffer = ""
@@ -91,6 +99,7 @@ def build_chunks(docs: Iterable[dict]) -> list[dict]:
                         "article_title": title,
                         "article_url": url_guess,
                         "car_model": model_name,
+                        "published_at": published_at,
                         "chunk_text": part.strip(),
                     }
                 )
@@ -102,6 +111,7 @@ def build_chunks(docs: Iterable[dict]) -> list[dict]:
                     "article_title": title,
                     "article_url": url_guess,
                     "car_model": model_name,
+                    "published_at": published_at,
                     "chunk_text": buffer.strip(),
                 }
             )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import argparse
 import json
 import sys
 from pathlib import Path
@@ -12,8 +13,18 @@ ROOT = Path(__file__).resolve().parent.parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from src.config import CHUNKS_JSON, INDEX_DIR, INDEX_METADATA, INDEX_PATH  # noqa: E402
+from src.config import CHUNKS_JSON, EMBEDDING_MODEL_NAME, SHARD_BY, SNAPSHOT_KEEP  # noqa: E402
 from src.rag.embeddings import embed_texts  # noqa: E402
+from src.rag.vector_store import (  # noqa: E402
+    Shard,
+    content_hash,
+    gc_snapshots,
+    group_chunks,
+    load_manifest,
+    load_shard,
+    publish_snapshot,
+    read_current_version,
+)
 
 
 def load_chunks() -> list[dict]:
@@ -29,21 +40,93 @@ def build_index(chunks: list[dict]) -> tuple[faiss.IndexFlatL2, np.ndarray]:
     return index, embeddings
 
 
-def persist_index(index: faiss.IndexFlatL2, chunks: list[dict]) -> None:
-    INDEX_DIR.mkdir(parents=True, exist_ok=True)
-    faiss.write_index(index, str(INDEX_PATH))
-    INDEX_METADATA.write_text(json.dumps(chunks, ensure_ascii=False, indent=2), encoding="utf-8")
+def _reusable_entries(version: str, shard_by: str) -> dict[str, dict]:
+    """
+    Shard entries of the current snapshot that may be reused. An unreadable or incompatible
+    manifest means nothing is reused: ingestion is how a broken CURRENT gets repaired.
+    """
+    try:
+        manifest = load_manifest(version)
+    except (OSError, ValueError) as exc:
+        print(f"Current snapshot {version} is unreadable ({exc}); rebuilding all shards.")
+        return {}
+    entries = manifest.get("shards")
+    if (
+        manifest.get("shard_by") != shard_by
+        or manifest.get("embedding_model") != EMBEDDING_MODEL_NAME
+        or not isinstance(entries, list)
+    ):
+        return {}
+    return {entry["id"]: entry for entry in entries if isinstance(entry, dict) and "id" in entry}
 
 
-def main() -> None:
+def build_shards(
+    chunks: list[dict],
+    shard_by: str = SHARD_BY,
+    rebuild: set[str] | None = None,
+    full: bool = False,
+) -> tuple[list[Shard], list[str]]:
+    """
+    Group chunks into shards and embed them. Shards whose texts are unchanged since the
+    current snapshot (same shard_by and embedding model) are reused instead of re-embedded,
+    unless listed in `rebuild` or `full` is set. Returns (shards, ids of rebuilt shards).
+    """
+    groups = group_chunks(chunks, shard_by)
+    unknown = (rebuild or set()) - groups.keys()
+    if unknown:
+        raise ValueError(f"Unknown shard(s): {', '.join(sorted(unknown))}. Available: {', '.join(groups)}")
+
+    version = read_current_version()
+    previous: dict[str, dict] = {}
+    if version and not full:
+        previous = _reusable_entries(version, shard_by)
+
+    shards: list[Shard] = []
+    rebuilt: list[str] = []
+    for shard_id, shard_chunks in groups.items():
+        entry = previous.get(shard_id)
+        if entry and shard_id not in (rebuild or set()) and entry.get("content_hash") == content_hash(shard_chunks):
+            try:
+                reused = load_shard(version, entry)
+            except (OSError, RuntimeError, ValueError, KeyError) as exc:
+                print(f"Cannot reuse shard {shard_id} from snapshot {version} ({exc}); re-embedding.")
+            else:
+                # Vectors are unchanged; take the fresh metadata (chunk ids may have shifted).
+                shards.append(Shard(shard_id, reused.index, shard_chunks))
+                continue
+        index, _ = build_index(shard_chunks)
+        shards.append(Shard(shard_id, index, shard_chunks))
+        rebuilt.append(shard_id)
+    return shards, rebuilt
+
+
+def persist_index(shards: list[Shard], shard_by: str = SHARD_BY, keep: int = SNAPSHOT_KEEP) -> str:
+    """Publish a new versioned snapshot, switch CURRENT to it and prune old ones."""
+    version = publish_snapshot(shards, EMBEDDING_MODEL_NAME, shard_by)
+    removed = gc_snapshots(keep=keep)
+    if removed:
+        print(f"Removed {len(removed)} old snapshot(s): {', '.join(removed)}")
+    return version
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Embed chunks and publish a sharded index snapshot.")
+    parser.add_argument("--shard-by", choices=["article", "period"], default=SHARD_BY)
+    parser.add_argument("--shard", action="append", default=[], help="Force re-embedding of this shard (repeatable).")
+    parser.add_argument("--full", action="store_true", help="Re-embed every shard instead of reusing unchanged ones.")
+    args = parser.parse_args(argv)
+
     chunks = load_chunks()
     if not chunks:
         raise ValueError("No chunks found; run build_corpus first.")
-    index, _ = build_index(chunks)
-    persist_index(index, chunks)
-    print(f"Index built with {index.ntotal} vectors.")
+    shards, rebuilt = build_shards(chunks, args.shard_by, set(args.shard), args.full)
+    version = persist_index(shards, args.shard_by)
+    total = sum(shard.index.ntotal for shard in shards)
+    print(
+        f"Index built with {total} vectors in {len(shards)} shard(s) "
+        f"({len(rebuilt)} re-embedded). Published snapshot {version}."
+    )
 
 
 if __name__ == "__main__":
     main()
-
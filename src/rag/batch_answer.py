@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.config import BATCH_LLM_CONCURRENCY, TOP_K
+from src.rag.chat_orchestrator import build_prompt, complete, format_sources, get_client
+from src.rag.embeddings import embed_texts
+from src.rag.retriever import get_active_index, retrieve_batch
+
+
+def load_questions(path: Path) -> list[dict]:
+    """
+    Read one JSON object per line: {"question": ..., "id"?: ..., "expected_chunk_ids"?: [...]}.
+    Lines without an id are numbered by their position in the file.
+    """
+    items: list[dict] = []
+    for line_no, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"{path}:{line_no}: invalid JSON ({exc})") from exc
+        if not isinstance(item, dict):
+            raise ValueError(f"{path}:{line_no}: expected a JSON object")
+        if not item.get("question"):
+            raise ValueError(f"{path}:{line_no}: missing 'question'")
+        item.setdefault("id", line_no)
+        items.append(item)
+    return items
+
+
+def recall_at_k(expected: list[str], retrieved_ids: list[str]) -> float:
+    if not expected:
+        return 0.0
+    return len(set(expected) & set(retrieved_ids)) / len(set(expected))
+
+
+def _timed_complete(messages: List[dict], client) -> Tuple[Optional[str], Optional[str], float]:
+    start = time.perf_counter()
+    try:
+        reply, error = complete(messages, client), None
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        # One failed call should not sink the rest of the batch.
+        reply, error = None, f"{type(exc).__name__}: {exc}"
+    return reply, error, (time.perf_counter() - start) * 1000
+
+
+def answer_batch(
+    items: list[dict],
+    top_k: int = TOP_K,
+    concurrency: int = BATCH_LLM_CONCURRENCY,
+    with_llm: bool = True,
+) -> tuple[list[dict], dict]:
+    """
+    Answer many questions without touching chat history. Embedding and FAISS search run
+    once for the whole batch; LLM calls run on a pool of `concurrency` threads.
+    Per-record embed/search timings are the batch totals divided evenly across questions.
+    Returns (records, summary).
+    """
+    if not items:
+        return [], {"questions": 0}
+    questions = [item["question"] for item in items]
+
+    # Load the index up front so its one-off cost is not billed to search.
+    start = time.perf_counter()
+    get_active_index()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    query_vecs = embed_texts(questions)
+    embed_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    retrieved = retrieve_batch(questions, top_k, query_vecs)
+    search_ms = (time.perf_counter() - start) * 1000
+
+    replies: list[Tuple[Optional[str], Optional[str], float]] = [(None, None, 0.0)] * len(items)
+    llm_ms = 0.0
+    if with_llm:
+        client = get_client()
+        prompts = [build_prompt(q, hits, []) for q, hits in zip(questions, retrieved)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            replies = list(pool.map(lambda messages: _timed_complete(messages, client), prompts))
+        llm_ms = (time.perf_counter() - start) * 1000
+
+    records: list[dict] = []
+    recalls: list[float] = []
+    for item, hits, (reply, error, call_ms) in zip(items, retrieved, replies):
+        sources = format_sources(hits)
+        record = {
+            "id": item["id"],
+            "question": item["question"],
+            "answer": reply,
+            "sources": sources,
+            "timings_ms": {
+                "embed": embed_ms / len(items),
+                "search": search_ms / len(items),
+                "llm": call_ms,
+            },
+        }
+        if error:
+            record["error"] = error
+        expected = item.get("expected_chunk_ids")
+        if expected:
+            record["expected_chunk_ids"] = expected
+            record["recall_at_k"] = recall_at_k(expected, [s["chunk_id"] for s in sources])
+            recalls.append(record["recall_at_k"])
+        records.append(record)
+
+    summary = {
+        "questions": len(items),
+        "top_k": top_k,
+        "index_load_ms": load_ms,
+        "embed_ms": embed_ms,
+        "search_ms": search_ms,
+        "llm_ms": llm_ms,
+        "llm_errors": sum(1 for r in records if "error" in r),
+        "scored": len(recalls),
+        "mean_recall_at_k": sum(recalls) / len(recalls) if recalls else None,
+    }
+    return records, summary
+
+
+def write_results(path: Path, records: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        for record in records:
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
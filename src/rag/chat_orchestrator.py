@@ -126,23 +126,21 @@ def build_prompt(user_query: str, context_chunks: List[Tuple[dict, float]], hist
     return messages
 
 
-def answer(user_query: str, session_id: str) -> tuple[str, List[dict]]:
-    ensure_db()
-    retrieved = retrieve(user_query)
-    history = fetch_history(session_id)
-    messages = build_prompt(user_query, retrieved, history)
-
+def get_client() -> OpenAI:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY not set")
+    return OpenAI(api_key=api_key)
+
 
-    client = OpenAI(api_key=api_key)
+def complete(messages: List[dict], client: OpenAI | None = None) -> str:
+    client = client or get_client()
     completion = client.chat.completions.create(model=OPENAI_MODEL, messages=messages)
-    assistant_message = completion.choices[0].message.content
+    return completion.choices[0].message.content
 
-    save_turn(session_id, user_query, assistant_message)
 
-    sources = [
+def format_sources(retrieved: List[Tuple[dict, float]]) -> List[dict]:
+    return [
         {
             "article_title": chunk.get("article_title"),
             "article_url": chunk.get("article_url"),
@@ -152,5 +150,16 @@ def answer(user_query: str, session_id: str) -> tuple[str, List[dict]]:
         for chunk, dist in retrieved
     ]
 
-    return assistant_message, sources
+
+def answer(user_query: str, session_id: str) -> tuple[str, List[dict]]:
+    ensure_db()
+    retrieved = retrieve(user_query)
+    history = fetch_history(session_id)
+    messages = build_prompt(user_query, retrieved, history)
+
+    assistant_message = complete(messages)
+
+    save_turn(session_id, user_query, assistant_message)
+
+    return assistant_message, format_sources(retrieved)
 
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import heapq
 import re
-from typing import List, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
 
 import faiss
 import numpy as np
 
-from src.config import TOP_K
+from src.config import SEARCH_WORKERS, SNAPSHOT_POLL_SECONDS, TOP_K
 from src.rag.embeddings import embed_texts
-from src.rag.vector_store import load_index, load_metadata
+from src.rag.vector_store import Shard, load_current, read_current_version
 
 
 def extract_candidate_models(metadata: list[dict]) -> set[str]:
@@ -44,24 +48,221 @@ def filter_metadata_by_models(metadata: list[dict], models: set[str]) -> list[in
     return indices
 
 
-def retrieve(query: str, top_k: int = TOP_K) -> List[Tuple[dict, float]]:
-    metadata = load_metadata()
-    index: faiss.Index = load_index()
-    models = extract_candidate_models(metadata)
-    hits = detect_models_in_query(query, models)
-    allowed_indices = filter_metadata_by_models(metadata, hits)
-
-    query_vec = embed_texts([query]).astype(np.float32)
-    distances, idxs = index.search(query_vec, top_k if not allowed_indices else len(allowed_indices))
-
-    results: List[Tuple[dict, float]] = []
-    for dist, idx in zip(distances[0], idxs[0]):
-        if idx == -1:
-            continue
-        if allowed_indices and idx not in allowed_indices:
-            continue
-        results.append((metadata[idx], float(dist)))
-        if len(results) >= top_k:
-            break
+@dataclass
+class ShardRoute:
+    """
+    A shard plus the lowercased titles and car models used to route filtered queries,
+    computed once at load so selecting shards never scans chunk metadata.
+    """
+
+    shard: Shard
+    titles: frozenset[str]
+    car_models: frozenset[str]
+    allowed_rows: dict[frozenset[str], Optional[np.ndarray]] = field(default_factory=dict)
+
+    def matches(self, models: frozenset[str]) -> bool:
+        """Shard-level version of `filter_metadata_by_models`."""
+        return bool(self.car_models & models) or any(m in title for title in self.titles for m in models)
+
+    def allowed(self, models: frozenset[str]) -> Optional[np.ndarray]:
+        """Row ids matching `models`, or None when every row matches. Cached per model set."""
+        if models not in self.allowed_rows:
+            rows = filter_metadata_by_models(self.shard.metadata, set(models))
+            self.allowed_rows[models] = (
+                None if len(rows) == len(self.shard.metadata) else np.asarray(rows, dtype=np.int64)
+            )
+        return self.allowed_rows[models]
+
+
+def build_routes(shards: list[Shard], manifest: Optional[dict] = None) -> list[ShardRoute]:
+    entries = {entry["id"]: entry for entry in (manifest or {}).get("shards", [])}
+    routes: list[ShardRoute] = []
+    for shard in shards:
+        entry = entries.get(shard.shard_id)
+        if entry is not None:
+            titles, car_models = entry.get("article_titles", []), entry.get("car_models", [])
+        else:
+            # Legacy single-shard index: no manifest, derive from metadata once.
+            titles = [c.get("article_title") or "" for c in shard.metadata]
+            car_models = [c.get("car_model") or "" for c in shard.metadata]
+        routes.append(
+            ShardRoute(
+                shard,
+                frozenset(t.lower() for t in titles if t),
+                frozenset(m.lower() for m in car_models if m),
+            )
+        )
+    return routes
+
+
+@dataclass(frozen=True)
+class ActiveIndex:
+    version: Optional[str]
+    shards: list[Shard]
+    manifest: Optional[dict]
+    models: set[str] = field(default_factory=set)
+    routes: list[ShardRoute] = field(default_factory=list)
+
+
+def _load_active() -> ActiveIndex:
+    shards, manifest = load_current()
+    version = manifest["version"] if manifest else None
+    metadata = [chunk for shard in shards for chunk in shard.metadata]
+    return ActiveIndex(version, shards, manifest, extract_candidate_models(metadata), build_routes(shards, manifest))
+
+
+class IndexWatcher:
+    """
+    Holds the live index in memory and swaps in new snapshots from a background thread.
+
+    Queries read `current()` without locking; the reference is replaced only after the
+    new snapshot is fully loaded, so in-flight searches keep using the previous one.
+    """
+
+    def __init__(self, poll_seconds: float = SNAPSHOT_POLL_SECONDS) -> None:
+        self.poll_seconds = poll_seconds
+        self._active: Optional[ActiveIndex] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def current(self) -> ActiveIndex:
+        active = self._active
+        if active is not None:
+            return active
+        with self._lock:
+            if self._active is None:
+                self._active = _load_active()
+                self._start()
+            return self._active
+
+    def refresh(self) -> bool:
+        """Load the snapshot CURRENT points at if it differs from the live one. Returns True on swap."""
+        active = self._active
+        if active is None or read_current_version() == active.version:
+            return False
+        loaded = _load_active()
+        if loaded.version == active.version:
+            return False
+        self._active = loaded
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _start(self) -> None:
+        if self.poll_seconds <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="index-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                if self.refresh():
+                    print(f"Switched to index snapshot {self._active.version}")
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                # Keep serving the previous snapshot; retry on the next poll.
+                print(f"Index reload failed: {exc}")
+
+
+_watcher = IndexWatcher()
+
+
+def get_active_index() -> ActiveIndex:
+    return _watcher.current()
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="shard-search")
+    return _executor
+
+
+def _search_shard(
+    route: ShardRoute, query_vecs: np.ndarray, top_k: int, models: frozenset[str]
+) -> list[list[Tuple[float, dict]]]:
+    shard = route.shard
+    params = None
+    k = min(top_k, shard.index.ntotal)
+    allowed = route.allowed(models) if models else None
+    if allowed is not None:
+        # Restrict the search to matching rows so filtered hits are not crowded out.
+        params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(allowed))
+        k = min(top_k, len(allowed))
+    if k == 0:
+        return [[] for _ in range(len(query_vecs))]
+    distances, idxs = shard.index.search(query_vecs, k, params=params)
+    return [
+        [(float(dist), shard.metadata[idx]) for dist, idx in zip(row_d, row_i) if idx != -1]
+        for row_d, row_i in zip(distances, idxs)
+    ]
+
+
+def search_shards(
+    routes: list[ShardRoute],
+    query_vecs: np.ndarray,
+    top_k: int = TOP_K,
+    models: set[str] | None = None,
+    executor: ThreadPoolExecutor | None = None,
+) -> list[List[Tuple[dict, float]]]:
+    """
+    Fan a (n_queries x dim) matrix out over the shards and merge each row's per-shard
+    top-k into a global top-k. When `models` is given, only shards whose titles or car
+    models match are searched, with an ID filter if just some of their rows match.
+    FAISS releases the GIL during search, so shards run in parallel on the pool.
+    """
+    lowered = frozenset(m.lower() for m in (models or ()))
+    targets = [route for route in routes if not lowered or route.matches(lowered)]
+    if not targets:
+        # No article matches the detected models: fall back to an unfiltered search.
+        targets, lowered = routes, frozenset()
+    query_vecs = np.ascontiguousarray(query_vecs, dtype=np.float32)
+    if len(targets) <= 1:
+        per_shard = [_search_shard(route, query_vecs, top_k, lowered) for route in targets]
+    else:
+        pool = executor or _get_executor()
+        per_shard = list(pool.map(lambda route: _search_shard(route, query_vecs, top_k, lowered), targets))
+
+    results: list[List[Tuple[dict, float]]] = []
+    for row in range(len(query_vecs)):
+        candidates = (hit for shard_hits in per_shard for hit in shard_hits[row])
+        best = heapq.nsmallest(top_k, candidates, key=lambda hit: hit[0])
+        results.append([(chunk, dist) for dist, chunk in best])
     return results
 
+
+def retrieve(query: str, top_k: int = TOP_K) -> List[Tuple[dict, float]]:
+    return retrieve_batch([query], top_k)[0]
+
+
+def retrieve_batch(
+    queries: List[str], top_k: int = TOP_K, query_vecs: np.ndarray | None = None
+) -> list[List[Tuple[dict, float]]]:
+    """
+    Retrieve for many queries at once: one embedding pass (unless `query_vecs` is given)
+    and one multi-row FAISS search per distinct set of detected car models.
+    """
+    if not queries:
+        return []
+    active = get_active_index()
+    if query_vecs is None:
+        query_vecs = embed_texts(queries)
+    query_vecs = np.asarray(query_vecs, dtype=np.float32)
+
+    groups: dict[frozenset[str], list[int]] = {}
+    for row, query in enumerate(queries):
+        groups.setdefault(frozenset(detect_models_in_query(query, active.models)), []).append(row)
+
+    results: list[List[Tuple[dict, float]]] = [[] for _ in queries]
+    for hits, rows in groups.items():
+        for row, hits_for_row in zip(rows, search_shards(active.routes, query_vecs[rows], top_k, set(hits))):
+            results[row] = hits_for_row
+    return results
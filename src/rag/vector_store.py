@@ -1,12 +1,31 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
 import faiss
 
-from src.config import INDEX_METADATA, INDEX_PATH
+from src.config import (
+    CURRENT_POINTER,
+    INDEX_METADATA,
+    INDEX_PATH,
+    SHARD_BY,
+    SNAPSHOT_INDEX_FILE,
+    SNAPSHOT_KEEP,
+    SNAPSHOT_MANIFEST_FILE,
+    SNAPSHOT_METADATA_FILE,
+    SNAPSHOT_SHARDS_DIR,
+    SNAPSHOTS_DIR,
+)
 
 
 def load_index(index_path: Path | None = None) -> faiss.IndexFlatL2:
@@ -23,10 +42,293 @@ def load_metadata(metadata_path: Path | None = None) -> list[dict]:
     return json.loads(metadata_path.read_text(encoding="utf-8"))
 
 
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _fsync_file(path: Path) -> None:
+    fd = os.open(str(path), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    """Write to a temp file in the same directory, fsync, then rename over `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(text)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    _fsync_dir(path.parent)
+
+
+def _atomic_write_index(index: faiss.Index, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+    os.close(fd)
+    try:
+        faiss.write_index(index, tmp_name)
+        _fsync_file(Path(tmp_name))
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    _fsync_dir(path.parent)
+
+
 def save_index(index: faiss.IndexFlatL2, chunks: list[dict], index_path: Optional[Path] = None, metadata_path: Optional[Path] = None) -> None:
     index_path = index_path or INDEX_PATH
     metadata_path = metadata_path or INDEX_METADATA
-    index_path.parent.mkdir(parents=True, exist_ok=True)
-    faiss.write_index(index, str(index_path))
-    metadata_path.write_text(json.dumps(chunks, ensure_ascii=False, indent=2), encoding="utf-8")
+    _atomic_write_index(index, index_path)
+    _atomic_write_text(metadata_path, json.dumps(chunks, ensure_ascii=False, indent=2))
+
+
+# ---------------------------------------------------------------------------
+# Versioned snapshots
+#
+# Layout under INDEX_DIR:
+#   snapshots/<version>/shards/<shard_id>/index.faiss
+#   snapshots/<version>/shards/<shard_id>/metadata.json
+#   snapshots/<version>/manifest.json   (written last; marks the snapshot complete)
+#   CURRENT                             (name of the live version, swapped atomically)
+#
+# A snapshot directory is staged under a dot-prefixed name and renamed into place
+# only once all files are on disk, so readers never observe a partial build.
+# ---------------------------------------------------------------------------
+
+_STALE_STAGING_SECONDS = 3600
+
+
+@dataclass
+class Shard:
+    shard_id: str
+    index: faiss.Index
+    metadata: list[dict]
+
+
+def corpus_hash(chunks: list[dict]) -> str:
+    payload = json.dumps(chunks, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def content_hash(chunks: list[dict]) -> str:
+    """Hash of the embedded texts only, so a shard survives chunk-id renumbering."""
+    payload = json.dumps([c.get("chunk_text", "") for c in chunks], ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def shard_key(chunk: dict, shard_by: str = SHARD_BY) -> str:
+    if shard_by == "article":
+        slug = (chunk.get("article_url") or "").rstrip("/").split("/")[-1]
+        return re.sub(r"[^a-zA-Z0-9_-]", "-", slug) or "unknown"
+    if shard_by == "period":
+        published_at = chunk.get("published_at") or ""
+        return published_at[:7] if re.match(r"\d{4}-\d{2}", published_at) else "undated"
+    raise ValueError(f"Unknown shard_by: {shard_by!r}")
+
+
+def group_chunks(chunks: list[dict], shard_by: str = SHARD_BY) -> dict[str, list[dict]]:
+    groups: dict[str, list[dict]] = {}
+    for chunk in chunks:
+        groups.setdefault(shard_key(chunk, shard_by), []).append(chunk)
+    return dict(sorted(groups.items()))
+
+
+def snapshot_dir(version: str, snapshots_dir: Path | None = None) -> Path:
+    return (snapshots_dir or SNAPSHOTS_DIR) / version
+
+
+def shard_dir(version: str, shard_id: str, snapshots_dir: Path | None = None) -> Path:
+    return snapshot_dir(version, snapshots_dir) / SNAPSHOT_SHARDS_DIR / shard_id
+
+
+def list_snapshots(snapshots_dir: Path | None = None) -> list[str]:
+    """Return completed snapshot versions, oldest first."""
+    snapshots_dir = snapshots_dir or SNAPSHOTS_DIR
+    if not snapshots_dir.exists():
+        return []
+    versions = [
+        p.name
+        for p in snapshots_dir.iterdir()
+        if p.is_dir() and not p.name.startswith(".") and (p / SNAPSHOT_MANIFEST_FILE).exists()
+    ]
+    return sorted(versions)
+
+
+def read_current_version(pointer_path: Path | None = None) -> str | None:
+    pointer_path = pointer_path or CURRENT_POINTER
+    try:
+        version = pointer_path.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def set_current_version(version: str, pointer_path: Path | None = None, snapshots_dir: Path | None = None) -> None:
+    if not (snapshot_dir(version, snapshots_dir) / SNAPSHOT_MANIFEST_FILE).exists():
+        raise FileNotFoundError(f"Snapshot {version} is missing or incomplete.")
+    _atomic_write_text(pointer_path or CURRENT_POINTER, version + "\n")
+
+
+def load_manifest(version: str, snapshots_dir: Path | None = None) -> dict:
+    manifest_path = snapshot_dir(version, snapshots_dir) / SNAPSHOT_MANIFEST_FILE
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"Manifest not found at {manifest_path}.")
+    return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+
+def load_shard(version: str, entry: dict, snapshots_dir: Path | None = None) -> Shard:
+    path = shard_dir(version, entry["id"], snapshots_dir)
+    index = load_index(path / SNAPSHOT_INDEX_FILE)
+    metadata = load_metadata(path / SNAPSHOT_METADATA_FILE)
+    if index.ntotal != entry["num_vectors"] or len(metadata) != entry["num_chunks"]:
+        raise ValueError(f"Shard {entry['id']} of snapshot {version} does not match its manifest.")
+    return Shard(entry["id"], index, metadata)
+
+
+def load_snapshot(version: str, snapshots_dir: Path | None = None) -> tuple[list[Shard], dict]:
+    manifest = load_manifest(version, snapshots_dir)
+    if not isinstance(manifest.get("shards"), list) or not manifest["shards"]:
+        raise ValueError(
+            f"Snapshot {version} has no shard list in its manifest (unsupported layout). "
+            "Run ingestion to publish a new snapshot."
+        )
+    shards = [load_shard(version, entry, snapshots_dir) for entry in manifest["shards"]]
+    return shards, manifest
+
+
+def load_current(
+    pointer_path: Path | None = None, snapshots_dir: Path | None = None
+) -> tuple[list[Shard], dict | None]:
+    """
+    Load the live snapshot. Falls back to the legacy flat `index.faiss` + `metadata.json`
+    as a single shard (manifest returned as None) when no snapshot has been published yet.
+    """
+    version = read_current_version(pointer_path)
+    if version is None:
+        return [Shard("all", load_index(), load_metadata())], None
+    return load_snapshot(version, snapshots_dir)
+
+
+def _shard_entry(shard: Shard) -> dict:
+    dates = sorted(c["published_at"] for c in shard.metadata if c.get("published_at"))
+    return {
+        "id": shard.shard_id,
+        "num_vectors": shard.index.ntotal,
+        "num_chunks": len(shard.metadata),
+        "content_hash": content_hash(shard.metadata),
+        "article_urls": sorted({c["article_url"] for c in shard.metadata if c.get("article_url")}),
+        "article_titles": sorted({c["article_title"] for c in shard.metadata if c.get("article_title")}),
+        "car_models": sorted({c["car_model"] for c in shard.metadata if c.get("car_model")}),
+        "published_from": dates[0] if dates else None,
+        "published_to": dates[-1] if dates else None,
+    }
+
+
+def publish_snapshot(
+    shards: list[Shard],
+    embedding_model: str,
+    shard_by: str = SHARD_BY,
+    snapshots_dir: Path | None = None,
+    pointer_path: Path | None = None,
+) -> str:
+    """Write a new snapshot directory, then atomically point CURRENT at it. Returns the version."""
+    if not shards:
+        raise ValueError("Cannot publish a snapshot without shards.")
+    dims = {shard.index.d for shard in shards}
+    if len(dims) != 1:
+        raise ValueError(f"Shards have mismatched dimensions: {sorted(dims)}")
+    snapshots_dir = snapshots_dir or SNAPSHOTS_DIR
+    snapshots_dir.mkdir(parents=True, exist_ok=True)
+    all_chunks = [chunk for shard in shards for chunk in shard.metadata]
+    digest = corpus_hash(all_chunks)
+    created_at = datetime.now(timezone.utc)
+    version = f"{created_at.strftime('%Y%m%dT%H%M%S%f')}-{digest[:8]}"
+
+    staging = Path(tempfile.mkdtemp(prefix=f".{version}.", dir=str(snapshots_dir)))
+    try:
+        for shard in shards:
+            path = staging / SNAPSHOT_SHARDS_DIR / shard.shard_id
+            path.mkdir(parents=True)
+            faiss.write_index(shard.index, str(path / SNAPSHOT_INDEX_FILE))
+            (path / SNAPSHOT_METADATA_FILE).write_text(
+                json.dumps(shard.metadata, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            # Shard files must be durable before the manifest and CURRENT can reference them.
+            _fsync_file(path / SNAPSHOT_INDEX_FILE)
+            _fsync_file(path / SNAPSHOT_METADATA_FILE)
+            _fsync_dir(path)
+        _fsync_dir(staging / SNAPSHOT_SHARDS_DIR)
+        manifest = {
+            "version": version,
+            "created_at": created_at.isoformat(),
+            "corpus_hash": digest,
+            "embedding_model": embedding_model,
+            "dim": dims.pop(),
+            "num_vectors": sum(shard.index.ntotal for shard in shards),
+            "num_chunks": len(all_chunks),
+            "num_articles": len({c.get("article_url") for c in all_chunks}),
+            "shard_by": shard_by,
+            "shards": [_shard_entry(shard) for shard in shards],
+        }
+        _atomic_write_text(staging / SNAPSHOT_MANIFEST_FILE, json.dumps(manifest, ensure_ascii=False, indent=2))
+        staging.chmod(0o755)
+        os.replace(staging, snapshot_dir(version, snapshots_dir))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _fsync_dir(snapshots_dir)
+
+    set_current_version(version, pointer_path, snapshots_dir)
+    return version
+
+
+def gc_snapshots(
+    keep: int = SNAPSHOT_KEEP, snapshots_dir: Path | None = None, pointer_path: Path | None = None
+) -> list[str]:
+    """
+    Delete all but the newest `keep` snapshots (never the current one) plus any
+    abandoned staging directories. Returns the removed versions.
+    """
+    snapshots_dir = snapshots_dir or SNAPSHOTS_DIR
+    if not snapshots_dir.exists():
+        return []
+    current = read_current_version(pointer_path)
+    versions = list_snapshots(snapshots_dir)
+    retained = set(versions[-keep:]) if keep > 0 else set()
+    if current:
+        retained.add(current)
 
+    removed: list[str] = []
+    for path in snapshots_dir.iterdir():
+        if not path.is_dir():
+            continue
+        if path.name.startswith("."):
+            # Leave recent staging dirs alone: another build may still be writing them.
+            if time.time() - path.stat().st_mtime > _STALE_STAGING_SECONDS:
+                shutil.rmtree(path, ignore_errors=True)
+            continue
+        if path.name in retained or path.name not in versions:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(path.name)
+    return sorted(removed)
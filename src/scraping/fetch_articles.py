@@ -31,6 +31,11 @@ def fetch_html(url: str, timeout: int = 20) -> str:
     return resp.text
 
 
+def extract_published_at(html: str) -> str | None:
+    match = re.search(r'"datePublished"\s*:\s*"([^"]+)"', html)
+    return match.group(1) if match else None
+
+
 def extract_content(html: str) -> tuple[str, list[str]]:
     soup = BeautifulSoup(html, "html.parser")
     # Remove non-content elements
@@ -49,10 +54,12 @@ def extract_content(html: str) -> tuple[str, list[str]]:
     return title, paragraphs
 
 
-def save_raw(slug: str, url: str, html: str, title: str, paragraphs: Iterable[str]) -> None:
+def save_raw(
+    slug: str, url: str, html: str, title: str, paragraphs: Iterable[str], published_at: str | None = None
+) -> None:
     RAW_DIR.mkdir(parents=True, exist_ok=True)
     (RAW_DIR / f"{slug}.html").write_text(html, encoding="utf-8")
-    payload = {"url": url, "title": title, "paragraphs": list(paragraphs)}
+    payload = {"url": url, "title": title, "published_at": published_at, "paragraphs": list(paragraphs)}
     (RAW_DIR / f"{slug}.txt").write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
 
@@ -65,7 +72,7 @@ def fetch_all(urls: list[str] | None = None) -> None:
         try:
             html = fetch_html(url)
             title, paragraphs = extract_content(html)
-            save_raw(slug, url, html, title, paragraphs)
+            save_raw(slug, url, html, title, paragraphs, extract_published_at(html))
             print(f"Saved {slug} ({len(paragraphs)} paragraphs)")
         except Exception as exc:  # pylint: disable=broad-exception-caught
             print(f"Failed {url}: {exc}")